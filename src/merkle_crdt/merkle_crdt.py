@@ -2,6 +2,7 @@
 Core implementation of the Merkle-CRDT that combines CRDT operations with a Merkle tree structure.
 """
 import asyncio
+from collections import deque
 from typing import Any, Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass
 import hashlib
@@ -88,12 +89,36 @@ class MerkleCRDT:
         return new_node
 
     def topo(self, node: MerkleNode, l: list[MerkleNode]):
+        # Kahn's algorithm over the not-yet-applied part of the DAG, so children (causal
+        # dependencies) always come before their parents
         if node.hash_value in self.applied_ops:
             return
-        for child in node.children:
-            self.topo(self.tree.nodes[child], l)
-        self.applied_ops.add(node.hash_value)
-        l.append(node)
+        nodes = self.tree.nodes
+        pending: dict[str, int] = {} # Unapplied hash -> number of unapplied children
+        parents: dict[str, list[str]] = {}
+        stack = [node.hash_value]
+        while stack:
+            h = stack.pop()
+            if h in pending:
+                continue
+            count = 0
+            for child in nodes[h].children:
+                if child in self.applied_ops:
+                    continue
+                count += 1
+                parents.setdefault(child, []).append(h)
+                if child not in pending:
+                    stack.append(child)
+            pending[h] = count
+        ready = deque(h for h, count in pending.items() if count == 0)
+        while ready:
+            h = ready.popleft()
+            self.applied_ops.add(h)
+            l.append(nodes[h])
+            for parent in parents.get(h, ()):
+                pending[parent] -= 1
+                if pending[parent] == 0:
+                    ready.append(parent)
         # TODO: sort by height so things that rely on height locality are more efficient
         # TODO: also add batching support since that suits our use case very nicely
 
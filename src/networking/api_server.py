@@ -1,4 +1,6 @@
-from typing import Set
+import gzip
+import uuid
+from typing import Callable, Set
 import fastapi
 from serde.json import from_json, to_json
 import trio
@@ -13,9 +15,31 @@ app = fastapi.FastAPI()
 
 # Two ways to sync: Pull and push nodes
 
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Request, Response
+from fastapi.routing import APIRoute
 
 FS_TREE = "root"
+# Response header carrying a per-process id, so peers can tell when we restarted
+INSTANCE_HEADER = "X-Instance-Id"
+
+class GzipRequest(Request):
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            body = await super().body()
+            if "gzip" in self.headers.getlist("Content-Encoding"):
+                body = gzip.decompress(body)
+            self._body = body
+        return self._body
+
+class GzipRoute(APIRoute):
+    # Transparently decompresses gzip-encoded request bodies sent by peers
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+
+        async def custom_route_handler(request: Request) -> Response:
+            return await original_route_handler(GzipRequest(request.scope, request.receive))
+
+        return custom_route_handler
 
 class APIHandler:
     inode_store: InodeStore
@@ -23,20 +47,24 @@ class APIHandler:
     replica: int
 
     def __init__(self, inode_store: InodeStore, ktree: MerkleKTree, replica: int):
-        self.router = APIRouter()
+        self.router = APIRouter(route_class=GzipRoute)
         self.inode_store = inode_store
         self.ktree = ktree
         self.replica = replica
+        self.instance = uuid.uuid4().hex
         self.router.add_api_route("/bulk_get_nodes_to_add", self.bulk_get_nodes_to_add, methods=["POST"])
         self.router.add_api_route("/bulk_add", self.bulk_add, methods=["POST"])
         self.router.add_api_route("/bulk_root", self.bulk_inform_root, methods=["POST"])
         self.router.add_api_route("/healthcheck", self.healthcheck, methods=["GET"])
+        self.router.add_api_route("/root", self.get_root_hash, methods=["GET"])
+        self.router.add_api_route("/roots", self.get_roots, methods=["GET"])
 
     async def bulk_add(self, pairs: dict[str, list[str]]):
         for (k, v) in pairs.items():
             await self.add_nodes(k, v)
 
-    async def bulk_get_nodes_to_add(self, pairs: dict[str, list[str]]) -> dict[str, list[str]]:
+    async def bulk_get_nodes_to_add(self, pairs: dict[str, list[str]], response: Response) -> dict[str, list[str]]:
+        response.headers[INSTANCE_HEADER] = self.instance
         r = {}
         for (k, v) in pairs.items():
             r[k] = await self.get_nodes_to_add(k, v)
@@ -136,6 +164,18 @@ class APIHandler:
         # Returns the current root
         return to_json(crdt.tree.nodes[crdt.tree.root])
 
+    async def get_root_hash(self, tree: str = FS_TREE) -> str:
+        # Equal filesystem tree roots only mean replicas agree on names; contents are in the inode CRDTs
+        crdt = await self.get_crdt(tree)
+        return crdt.tree.root
+
+    async def get_roots(self) -> dict[str, str]:
+        # Root of the filesystem tree and of every loaded inode CRDT, keyed like the bulk endpoints
+        roots = {FS_TREE: self.ktree.tree.root}
+        for k, v in list(self.inode_store.inodes.items()):
+            roots[str(k)] = v.tree.root
+        return roots
+
     async def changes_since(self, time: int) -> list[str]:
         # Get list of changes since some time
         return []
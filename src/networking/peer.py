@@ -1,5 +1,7 @@
 from typing import Optional, Dict, Any
 import asyncio
+from collections import deque
+import gzip
 import json
 import msgpack
 import httpx
@@ -7,8 +9,33 @@ from serde.json import to_json
 import trio
 
 from filesystem.inode_store import InodeStore
-from merkle_crdt.merkle_crdt import MerkleCRDT
+from merkle_crdt.merkle_crdt import MerkleCRDT, MerkleNode
 from merkle_crdt.merkle_ktree import MerkleKTree
+from networking.api_server import FS_TREE, INSTANCE_HEADER
+
+def compressed(payload: Any) -> dict[str, Any]:
+    # Serialized nodes are highly repetitive, so gzip the request body
+    return {
+        "content": gzip.compress(json.dumps(payload).encode(), compresslevel=3),
+        "headers": {"Content-Encoding": "gzip", "Content-Type": "application/json"},
+    }
+
+def walk(nodes: dict[str, MerkleNode], root: str, depth: int, already_have: set[str]) -> list[str]:
+    # Breadth-first descendants of root up to depth - 1 levels, skipping nodes already sent.
+    # Kept free of Peer state so a compiled implementation can be dropped in for it.
+    result = []
+    seen = {root}
+    frontier = deque([root])
+    for i in range(depth - 1):
+        nxt = deque()
+        for to_check in frontier:
+            for child in nodes[to_check].children:
+                if child not in already_have and child not in seen:
+                    seen.add(child)
+                    result.append(child)
+                    nxt.append(child)
+        frontier = nxt
+    return result
 
 class Peer:
     lock: asyncio.Lock
@@ -18,6 +45,8 @@ class Peer:
     inode_store: InodeStore
     ktree: MerkleKTree
     replica: int
+    peer_roots: dict[str, str] # Last root of each CRDT acknowledged by this peer
+    peer_instance: Optional[str] # Process id the peer reported when peer_roots was built
 
     def __init__(self, host: str, port: int, inode_store: InodeStore, ktree: MerkleKTree, replica: int):
         self.host = host
@@ -27,6 +56,8 @@ class Peer:
         self.inode_store = inode_store
         self.ktree = ktree
         self.replica = replica
+        self.peer_roots = {}
+        self.peer_instance = None
 
     async def healthcheck(self):
         async with httpx.AsyncClient() as client:
@@ -35,18 +66,15 @@ class Peer:
 
 
     async def push_all(self):
-        await self.healthcheck()
         async with self.lock:
             changes = {}
             changes["root"] = self.ktree
-            # Open all things in path
-            new_changes = self.inode_store.inodes.copy()
-            for k, v in new_changes.items():
+            # Open all things in path; snapshot items only, values aren't copied
+            for k, v in list(self.inode_store.inodes.items()):
                 changes[str(k)] = v
             await self.push_changelist(changes)
 
     async def push_changed(self):
-        await self.healthcheck()
         async with self.lock:
             # Get changed - assume fstree has changes
             changes = {}
@@ -58,51 +86,93 @@ class Peer:
             await self.push_changelist(changes)
 
     async def push_changelist(self, changelist: dict[str, MerkleCRDT]):
+        try:
+            await self._push_changelist(changelist)
+        except Exception:
+            # Whatever the peer acknowledged may not survive whatever went wrong; resend everything next time
+            self.peer_roots.clear()
+            raise
+
+    async def _push_changelist(self, changelist: dict[str, MerkleCRDT]):
         # Add nodes until all data transferred
         root = {}
         new_nodes = {}
         nodes_to_add = {}
+        added_hashes = {}
+        skipped = {}
+
+        def offer(k: str, r: str):
+            root[k] = r
+            new_nodes[k] = [to_json(changelist[k].tree.nodes[r])]
+            nodes_to_add[k] = set()
+            added_hashes[k] = set()
+
         for k, v in changelist.items():
             v.cut_root()
-            root[k] = v.tree.root
-            new_nodes[k] = [to_json(v.tree.nodes[v.tree.root])]
-            nodes_to_add[k] = set()
+            r = v.tree.root
+            # Skip CRDTs the peer already has at this root. The filesystem tree is always offered,
+            # so the first request also tells us whether the peer restarted since acknowledging them.
+            if self.peer_roots.get(k) == r and k != FS_TREE:
+                skipped[k] = r
+                continue
+            offer(k, r)
+        if len(root) == 0:
+            return
         depth = 1
+        first = True
         while len(new_nodes) != 0:
             async with httpx.AsyncClient() as client:
-                response = await client.post(f'http://{self.host}:{self.port}/bulk_get_nodes_to_add', json=new_nodes)
+                # The sync request doubles as the liveness check; an unreachable peer raises
+                # out to peer_loop, which logs it
+                response = await client.post(f'http://{self.host}:{self.port}/bulk_get_nodes_to_add', **compressed(new_nodes))
+                response.raise_for_status()
                 newer_nodes = response.json()
                 new_nodes = {}
                 for k, v in newer_nodes.items():
                     if len(v) != 0:
-                        new_nodes[k] = []
+                        nodes = changelist[k].tree.nodes
+                        added = nodes_to_add[k]
+                        added_k = added_hashes[k]
+                        batch = new_nodes[k] = []
                         for node in v:
-                            add = to_json(changelist[k].tree.nodes[node])
-                            if add not in nodes_to_add[k]:
-                                new_nodes[k].append(add)
-                                nodes_to_add[k].add(add)
-                                # Recursively add children up to depth
-                                new = {node}
-                                for i in range(depth - 1):
-                                    to_check_new = set()
-                                    for to_check in new:
-                                        for child in changelist[k].tree.nodes[to_check].children:
-                                            if child not in nodes_to_add[k]:
-                                                new_nodes[k].append(to_json(changelist[k].tree.nodes[child]))
-                                                to_check_new.add(child)
-                                    new = to_check_new
-
-                        if len(new_nodes[k]) == 0:
+                            add = to_json(nodes[node])
+                            if add not in added:
+                                batch.append(add)
+                                added.add(add)
+                                added_k.add(node)
+                                # Expand children breadth-first up to depth
+                                for child in walk(nodes, node, depth, added_k):
+                                    batch.append(to_json(nodes[child]))
+
+                        if len(batch) == 0:
                             new_nodes.pop(k)
+            if first:
+                first = False
+                instance = response.headers.get(INSTANCE_HEADER)
+                if instance != self.peer_instance:
+                    # A restarted peer may have lost anything it acknowledged, so offer the skipped CRDTs too
+                    self.peer_instance = instance
+                    self.peer_roots.clear()
+                    for k, r in skipped.items():
+                        offer(k, r)
+                elif FS_TREE in root and FS_TREE not in new_nodes and self.peer_roots.get(FS_TREE) == root[FS_TREE]:
+                    # Offered only as the probe; no need to inform the peer of a root it already has
+                    root.pop(FS_TREE)
+                    nodes_to_add.pop(FS_TREE)
             # TODO: cut this out to benchmark depth scaling
             depth *= 2
+        if len(root) == 0:
+            return
         for k in nodes_to_add.keys():
             nodes_to_add[k] = list(nodes_to_add[k])
         #print("deciding add ", nodes_to_add)
         #prinv("adding root ", root)
         print("Pushing changelist")
         async with httpx.AsyncClient() as client:
-            response = await client.post(f'http://{self.host}:{self.port}/bulk_add', json=nodes_to_add)
-            response = await client.post(f'http://{self.host}:{self.port}/bulk_root', json=root)
+            response = await client.post(f'http://{self.host}:{self.port}/bulk_add', **compressed(nodes_to_add))
+            response.raise_for_status()
+            response = await client.post(f'http://{self.host}:{self.port}/bulk_root', **compressed(root))
+            response.raise_for_status()
+        self.peer_roots.update(root)
 
 
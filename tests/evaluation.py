@@ -1,10 +1,14 @@
 import os
 import time
+import array
 import psutil
 import asyncio
 import random
+import shutil
 import string
 import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Tuple
 import pyfuse3
@@ -14,6 +18,43 @@ from filesystem.fuse_binding import FuseOps
 from filesystem.inode_store import LWWInodeStore
 from merkle_crdt.merkle_ktree import MerkleKTree
 
+# 1MB random block generated once at import and tiled for I/O benchmarks; random so the
+# gzip'd sync traffic it triggers isn't unrealistically small
+_IO_BUF = os.urandom(1024 * 1024)
+# Payload for the networked-volume write benchmarks (4B, matching the graph titles)
+PAYLOAD_BYTES = b'x' * 4
+# Row formatter for the networked volume CSV; no field can contain a comma or quote,
+# so csv.writer's quoting logic isn't needed
+_FMT = "{},{},{},{},{},{}\n".format
+# Interval between sync-completion polls; coarse so polling barely loads the peers being timed
+SYNC_POLL_SECONDS = 0.02
+# Burst rows buffered per operation before they are written to the CSV
+LOG_FLUSH_ROWS = 128
+# Longest curve drawn per peer count in the networked volume graphs
+MAX_PLOT_POINTS = 4000
+# Batched benchmarks double their batch until one timed span lasts at least this long
+MIN_BATCH_SECONDS = 0.1
+
+def write_config(path: str, config: dict):
+    """Write a volume config atomically so a starting peer never reads a partial file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(to_json(config))
+    os.replace(tmp_path, path)
+
+def is_fuse_mount(path: str) -> bool:
+    """Whether path is currently a FUSE mountpoint; falls back to os.path.ismount without /proc"""
+    path = os.path.abspath(path)
+    try:
+        with open("/proc/self/mounts") as f:
+            for line in f:
+                fields = line.split()
+                if fields[1] == path and fields[2].startswith("fuse"):
+                    return True
+        return False
+    except FileNotFoundError:
+        return os.path.ismount(path)
+
 # Define Config class to match the config.json structure
 @serde
 class Config:
@@ -28,216 +69,357 @@ class FilesystemEvaluator:
     def __init__(self, mount_point: str):
         self.mount_point = Path(mount_point)
         self.process = psutil.Process()
+        self.process.cpu_percent(interval=None) # Baseline for the non-blocking samples below
         self.results = {}
+        self.resource_samples = []
 
     def measure_resource_usage(self) -> Tuple[float, float]:
-        """Measure CPU and memory usage"""
-        cpu_percent = self.process.cpu_percent(interval=1)
+        """Measure CPU usage since the previous sample and current memory usage"""
+        cpu_percent = self.process.cpu_percent(interval=None)
         memory_info = self.process.memory_info()
         memory_mb = memory_info.rss / 1024 / 1024  # Convert to MB
         return cpu_percent, memory_mb
 
-    async def measure_io_speed(self, file_size_mb: int = 1) -> float:
-        """Measure raw I/O speed for a single file"""
+    async def sample_resources(self, interval: float = 1.0):
+        """Record (cpu_percent, memory_mb) into self.resource_samples every interval seconds until cancelled"""
+        while True:
+            self.resource_samples.append(self.measure_resource_usage())
+            await asyncio.sleep(interval)
+
+    async def measure_io_speed(self, file_size_mb: int = 1, repetitions: int = 5) -> Tuple[float, float, float]:
+        """Measure raw I/O speed for a single file; returns median and stdev in MB/s over repetitions, and median fsync seconds"""
         test_file = self.mount_point / "io_test_file"
-        data = os.urandom(file_size_mb * 1024 * 1024)
-        
-        # Write test
-        start_time = time.time()
-        with open(test_file, 'wb') as f:
-            f.write(data)
-        write_time = time.time() - start_time
-        
-        # Read test
-        start_time = time.time()
-        with open(test_file, 'rb') as f:
-            read_data = f.read()
-        read_time = time.time() - start_time
+        data = memoryview(_IO_BUF * file_size_mb)
+        read_view = memoryview(bytearray(len(data)))
+
+        def write_file() -> Tuple[float, float]:
+            # Unbuffered; the fsync is timed separately since FuseOps.fsync dumps the whole
+            # k-tree and inode store, which would swamp the write itself
+            fd = os.open(test_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                start_time = time.perf_counter_ns()
+                written = 0
+                while written < len(data):
+                    written += os.write(fd, data[written:])
+                write_end = time.perf_counter_ns()
+                os.fsync(fd)
+                return (write_end - start_time) / 1e9, (time.perf_counter_ns() - write_end) / 1e9
+            finally:
+                os.close(fd)
+
+        def read_file() -> float:
+            # Into a preallocated buffer
+            fd = os.open(test_file, os.O_RDONLY)
+            try:
+                start_time = time.perf_counter_ns()
+                read = 0
+                while read < len(read_view):
+                    n = os.readv(fd, [read_view[read:]])
+                    if n == 0:
+                        break
+                    read += n
+                return (time.perf_counter_ns() - start_time) / 1e9
+            finally:
+                os.close(fd)
         
-        # Cleanup
+        # Warm up: the first file through a fresh mount pays inode allocation and cache setup
+        write_file()
         os.remove(test_file)
         
-        write_speed = file_size_mb / write_time  # MB/s
-        read_speed = file_size_mb / read_time    # MB/s
-        return (write_speed + read_speed) / 2
-
-    async def measure_fs_operations(self, num_operations: int = 1000) -> float:
-        """Measure filesystem operations per second"""
-        operations = []
-        
-        # Create test files
-        for i in range(num_operations):
-            filename = f"test_file_{i}.txt"
-            filepath = self.mount_point / filename
-            start_time = time.time()
-            with open(filepath, 'w') as f:
-                f.write("test")
-            operations.append(time.time() - start_time)
-        
-        # Delete test files
-        for i in range(num_operations):
-            filename = f"test_file_{i}.txt"
-            filepath = self.mount_point / filename
-            start_time = time.time()
-            os.remove(filepath)
-            operations.append(time.time() - start_time)
-        
-        return num_operations * 2 / sum(operations)  # Operations per second
+        speeds = []
+        fsync_times = []
+        for _ in range(repetitions):
+            write_time, fsync_time = write_file()
+            fsync_times.append(fsync_time)
+            read_time = read_file()
+            os.remove(test_file)
+            
+            write_speed = file_size_mb / write_time  # MB/s
+            read_speed = file_size_mb / read_time    # MB/s
+            speeds.append((write_speed + read_speed) / 2)
+        return statistics.median(speeds), statistics.stdev(speeds) if len(speeds) > 1 else 0.0, statistics.median(fsync_times)
+
+    async def measure_fs_operations(self, num_operations: int = 1000, max_workers: int = 32) -> Tuple[float, dict]:
+        """Measure filesystem operations per second and per-operation latency statistics (p50/p95/p99, mean, stdev)"""
+        mount = os.fspath(self.mount_point)
+        # Per-op latencies in ns; creates in [0, n), deletes in [n, 2n)
+        times = array.array('d')
+
+        def create_one(i: int):
+            t = time.perf_counter_ns()
+            fd = os.open(paths[i], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            os.write(fd, b"test")
+            os.close(fd)
+            times[i] = time.perf_counter_ns() - t
+
+        def delete_one(i: int):
+            t = time.perf_counter_ns()
+            os.remove(paths[i])
+            times[num_operations + i] = time.perf_counter_ns() - t
+
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            # Warm up with a discarded batch so directory caches are populated before timing
+            warmup = max(10, num_operations // 20)
+            paths = [f"{mount}/test_file_{i}.txt" for i in range(warmup)]
+            times = array.array('d', [0.0]) * (warmup * 2)
+            await asyncio.gather(*(loop.run_in_executor(ex, create_one, i) for i in range(warmup)))
+            await asyncio.gather(*(loop.run_in_executor(ex, os.remove, p) for p in paths))
+            
+            while True:
+                # Build paths up front so only the syscalls are timed
+                paths = [f"{mount}/test_file_{i}.txt" for i in range(num_operations)]
+                times = array.array('d', [0.0]) * (num_operations * 2)
+                
+                # Create test files
+                start_time = time.perf_counter()
+                await asyncio.gather(*(loop.run_in_executor(ex, create_one, i) for i in range(num_operations)))
+                create_time = time.perf_counter() - start_time
+                
+                # Delete test files
+                start_time = time.perf_counter()
+                await asyncio.gather(*(loop.run_in_executor(ex, delete_one, i) for i in range(num_operations)))
+                delete_time = time.perf_counter() - start_time
+                
+                if create_time + delete_time >= MIN_BATCH_SECONDS:
+                    break
+                num_operations *= 2
+        
+        ops_per_second = num_operations * 2 / (create_time + delete_time)
+        percentiles = statistics.quantiles(times, n=100)
+        # Percentiles rather than just the mean: FUSE latency tends to be bimodal
+        latency = {
+            'p50_ms': percentiles[49] / 1e6,
+            'p95_ms': percentiles[94] / 1e6,
+            'p99_ms': percentiles[98] / 1e6,
+            'mean_ms': statistics.fmean(times) / 1e6,
+            'stdev_ms': statistics.pstdev(times) / 1e6,
+        }
+        return ops_per_second, latency
 
     async def measure_directory_operations(self, num_operations: int = 100) -> float:
         """Measure directory operations (create, move, delete) per second"""
-        operations = []
-        
-        # Create directories
-        for i in range(num_operations):
-            dirname = f"test_dir_{i}"
-            dirpath = self.mount_point / dirname
-            start_time = time.time()
-            os.makedirs(dirpath)
-            operations.append(time.time() - start_time)
-        
-        # Move directories
-        for i in range(num_operations):
-            old_path = self.mount_point / f"test_dir_{i}"
-            new_path = self.mount_point / f"moved_dir_{i}"
-            start_time = time.time()
-            os.rename(old_path, new_path)
-            operations.append(time.time() - start_time)
-        
-        # Delete directories
-        for i in range(num_operations):
-            dirpath = self.mount_point / f"moved_dir_{i}"
-            start_time = time.time()
-            os.rmdir(dirpath)
-            operations.append(time.time() - start_time)
-        
-        return num_operations * 3 / sum(operations)  # Operations per second
-
-    async def test_networked_volumes(self, duration_seconds: int = 120):
-        """Test networked volumes with continuous file operations"""
-        import csv
-        import subprocess
-        from datetime import datetime
-        import matplotlib.pyplot as plt
-        import pandas as pd
+        mount = os.fspath(self.mount_point)
         
-        # Create CSV file for logging
-        csv_file = "networked_volume_test.csv"
-        with open(csv_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['timestamp', 'operation_type', 'file_name', 'data_written', 'peer_count', 'cumulative_files', 'cumulative_data'])
-        
-        
-        for peer_count in range(2, 7, 2):  # Test with 2, 4, and 6 peers
-            print(f"Starting test with {peer_count} peer{'s' if peer_count > 1 else ''}...")
-            # Start 4 volumes (1 primary + 3 peers)
-            volumes = []
-            base_ports = [8000 + i for i in range(peer_count)]
-            base_mounts = [f"/tmp/mount{i}" for i in range(peer_count)]
-            base_paths = [f"/tmp/basepath{i}" for i in range(peer_count)]
+        # Warm up with discarded mkdir/rmdir pairs before timing
+        for i in range(max(10, num_operations // 20)):
+            os.mkdir(f"{mount}/warmup_dir_{i}")
+            os.rmdir(f"{mount}/warmup_dir_{i}")
+        
+        while True:
+            # Build paths up front so only the syscalls are timed
+            paths = [(f"{mount}/test_dir_{i}", f"{mount}/moved_dir_{i}") for i in range(num_operations)]
             
-            for mount in base_mounts:
-                if os.path.exists(mount):
-                    # clean up dir first
-                    os.system(f"rm -rf {mount}")
-                os.makedirs(mount, exist_ok=True)
+            # Create directories
+            start_time = time.perf_counter()
+            for dirpath, _ in paths:
+                os.mkdir(dirpath)
             
-            for base_path in base_paths:
-                if os.path.exists(base_path):
-                    # clean up dir first
-                    os.system(f"rm -rf {base_path}")
-                os.makedirs(base_path, exist_ok=True)
+            # Move directories
+            for old_path, new_path in paths:
+                os.rename(old_path, new_path)
             
-            # Create config files and start volumes
-            for i in range(peer_count):
-                config = {
-                    "replica": i + 1,
-                    "peers": [f"localhost:{p}" for p in base_ports if p != base_ports[i]],
-                    "basepath": base_paths[i],
-                    "mountpoint": base_mounts[i],
-                    "host": "localhost",
-                    "port": base_ports[i]
-                }
+            # Delete directories
+            for _, dirpath in paths:
+                os.rmdir(dirpath)
+            elapsed = time.perf_counter() - start_time
+            
+            if elapsed >= MIN_BATCH_SECONDS:
+                break
+            num_operations *= 2
+        
+        return num_operations * 3 / elapsed  # Operations per second
+
+    async def wait_for_mount(self, mountpoint: str, timeout: float = 15, mounted: bool = True) -> bool:
+        """Poll until mountpoint is mounted (or unmounted); returns False if that didn't happen within timeout"""
+        deadline = time.monotonic() + timeout
+        delay = 0.01
+        while is_fuse_mount(mountpoint) != mounted:
+            if time.monotonic() > deadline:
+                print(f"Timed out waiting for {mountpoint} to {'mount' if mounted else 'unmount'}")
+                return False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.2)
+        return True
+
+    async def wait_for_mounts(self, mountpoints: List[str]):
+        """Wait for every mountpoint to come up as a FUSE mount; raises TimeoutError naming any that didn't"""
+        mounted = await asyncio.gather(*(self.wait_for_mount(mount) for mount in mountpoints))
+        failed = [mount for mount, ok in zip(mountpoints, mounted) if not ok]
+        if failed:
+            # Running on anyway would benchmark the bare local directories
+            raise TimeoutError(f"Volumes failed to mount: {', '.join(failed)}")
+
+    def run_operation(self, csv_fh, stop: threading.Event, operation: str, mount: str, peer_count: int, duration_seconds: int, burst_size: int = 50, target_rate: float | None = None):
+        """Run one operation type against mount for duration_seconds (or until stop is set), logging one row per burst to csv_fh"""
+        rows = []
+        rows_append = rows.append # Bound once; the loop below appends every burst
+        # Rows are flushed every LOG_FLUSH_ROWS bursts, so a crash loses at most that many
+        print(f"\nTesting {operation} operations for {duration_seconds} seconds...")
+        # Ops run in bursts of burst_size; with a target_rate (ops/s) we sleep once per burst to pace
+        burst_interval = burst_size / target_rate if target_rate else 0
+        # Each burst's paths are formatted before it starts, so the op loop only indexes a short list
+        creates = operation != 'append_data'
+        paths = [f"{mount}/test_file_{i}.txt" for i in range(burst_size)] if creates else []
+        start_time = time.time()
+        file_counter = 0
+        cumulative_files = 0
+        cumulative_data = 0
+        payload = PAYLOAD_BYTES
+        append_name = "test_file_0.txt"
+        append_path = f"{mount}/{append_name}"
+        
+        try:
+            while time.time() - start_time < duration_seconds and not stop.is_set():
+                burst_start = time.time()
+                burst_data = 0
+                burst_files = 0
                 
-                # Create config file
-                config_path = f"config{i}.json"
-                with open(config_path, 'w') as f:
-                    f.write(to_json(config))
+                for j in range(burst_size):
+                    # Perform operation and track metrics
+                    if operation == 'create':
+                        os.close(os.open(paths[j], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644))
+                        burst_files += 1
+                    elif operation == 'create_with_data':
+                        fd = os.open(paths[j], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                        os.write(fd, payload)
+                        os.close(fd)
+                        burst_files += 1
+                        burst_data += len(payload)
+                    else:  # append_data
+                        fd = os.open(append_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                        os.write(fd, payload)
+                        os.close(fd)
+                        burst_data += len(payload)
+                    file_counter += 1
                 
-                # Start volume process
-                process = subprocess.Popen(['python', 'src/main.py', config_path])
-                volumes.append(process)
+                cumulative_files += burst_files
+                cumulative_data += burst_data
+                # Log the burst; cumulative totals are derived when graphing
+                rows_append([
+                    time.time() - start_time,
+                    operation,
+                    f"test_file_{file_counter - 1}.txt" if creates else append_name,
+                    burst_data,
+                    burst_files,
+                    peer_count
+                ])
                 
-                # Wait for volume to mount
-                time.sleep(10)
+                if len(rows) >= LOG_FLUSH_ROWS:
+                    csv_fh.writelines(_FMT(*row).encode() for row in rows)
+                    csv_fh.flush() # Past the 1MB file buffer too, so the rows are actually on disk
+                    rows.clear()
+                
+                if creates:
+                    paths = [f"{mount}/test_file_{i}.txt" for i in range(file_counter, file_counter + burst_size)]
+                
+                burst_elapsed = time.time() - burst_start
+                if burst_elapsed < burst_interval:
+                    time.sleep(burst_interval - burst_elapsed)
+        finally:
+            csv_fh.writelines(_FMT(*row).encode() for row in rows)
+            csv_fh.flush()
+        
+        print(f"Completed {operation} operations. Created {cumulative_files} files, wrote {cumulative_data} bytes")
+
+    async def run_peer_count(self, csv_fh, peer_count: int, duration_seconds: int, first: int = 0, burst_size: int = 50, target_rate: float | None = None):
+        """Start peer_count volumes using slots first..first+peer_count-1 and log every operation type to csv_fh"""
+        import subprocess
+        
+        print(f"Starting test with {peer_count} peer{'s' if peer_count > 1 else ''}...")
+        slots = range(first, first + peer_count)
+        base_ports = [8000 + i for i in slots]
+        base_mounts = [f"/tmp/mount{i}" for i in slots]
+        base_paths = [f"/tmp/basepath{i}" for i in slots]
+        config_paths = [f"config{i}.json" for i in slots]
+        
+        for path in base_mounts + base_paths:
+            # clean up dir first
+            shutil.rmtree(path, ignore_errors=True)
+            os.makedirs(path)
+        
+        # Write every config before starting any volume
+        for i in range(peer_count):
+            write_config(config_paths[i], {
+                "replica": first + i + 1,
+                "peers": [f"localhost:{p}" for p in base_ports if p != base_ports[i]],
+                "basepath": base_paths[i],
+                "mountpoint": base_mounts[i],
+                "host": "localhost",
+                "port": base_ports[i]
+            })
+        
+        volumes = []
+        stop = threading.Event()
+        try:
+            # Start volume processes
+            for path in config_paths:
+                volumes.append(subprocess.Popen(['python', 'src/main.py', path]))
             
-            try:
-                # Test each operation type separately
-                for operation in ['create', 'create_with_data', 'append_data']:
-                    rows = []
-                    print(f"\nTesting {operation} operations for {duration_seconds} seconds...")
-                    start_time = time.time()
-                    file_counter = 0
-                    cumulative_files = 0
-                    cumulative_data = 0
-                    
-                    while time.time() - start_time < duration_seconds:
-                        timestamp = time.time() - start_time
-                        
-                        # Perform operation and track metrics
-                        data_written = 0
-                        if operation == 'create':
-                            filename = f"test_file_{file_counter}.txt"
-                            filepath = Path(base_mounts[0]) / filename
-                            with open(filepath, 'w') as f:
-                                pass
-                            cumulative_files += 1
-                        elif operation == 'create_with_data':
-                            filename = f"test_file_{file_counter}.txt"
-                            filepath = Path(base_mounts[0]) / filename
-                            data_written = 4 # 4B of data
-                            with open(filepath, 'w') as f:
-                                f.write('x' * data_written)
-                            cumulative_files += 1
-                            cumulative_data += data_written
-                        else:  # append_data
-                            filename = f"test_file_0.txt"
-                            filepath = Path(base_mounts[0]) / filename
-                            data_written = 4 # 4B of data
-                            with open(filepath, 'a') as f:
-                                f.write('x' * data_written)
-                            cumulative_data += data_written
-                            
-                        file_counter += 1
-                        # await asyncio.sleep(0.1)  # Small delay between operations
-                        # Log operation with metrics for each peer count
-                        rows.append([
-                            timestamp,
-                            operation,
-                            filename,
-                            data_written,
-                            peer_count,
-                            cumulative_files,
-                            cumulative_data
-                        ])
-                    
-                    with open(csv_file, 'a', newline='') as f:
-                        writer = csv.writer(f)
-                        writer.writerows(rows)
-                print(f"Completed {operation} operations. Created {cumulative_files} files, wrote {cumulative_data} bytes")
-                    
-            finally:
-                # Cleanup
-                for process in volumes:
-                    process.terminate()
-                    process.wait()
+            # Wait for all volumes to mount
+            await self.wait_for_mounts(base_mounts)
+            
+            # Test each operation type separately; the blocking loop runs off the event loop
+            # so other peer counts can set up and tear down meanwhile
+            for operation in ['create', 'create_with_data', 'append_data']:
+                worker = asyncio.ensure_future(asyncio.to_thread(self.run_operation, csv_fh, stop, operation, base_mounts[0], peer_count, duration_seconds, burst_size, target_rate))
+                try:
+                    await asyncio.shield(worker)
+                except asyncio.CancelledError:
+                    # Cancelling doesn't stop the thread; wait for it so it's done with csv_fh
+                    stop.set()
+                    await worker
+                    raise
+                
+        finally:
+            # Cleanup
+            for process in volumes:
+                process.terminate()
+                process.wait()
+            
+            # Clean up config files
+            for i in range(peer_count):
+                os.remove(config_paths[i])
+                # Clean up mount points
+                subprocess.run(['fusermount', '-u', '-z', base_mounts[i]], check=False)
+                await self.wait_for_mount(base_mounts[i], timeout=5, mounted=False)  # Ensure unmount completes
+
+    async def test_networked_volumes(self, duration_seconds: int = 120, concurrency: int = 1, burst_size: int = 50, target_rate: float | None = None):
+        """Test networked volumes with continuous file operations, paced to target_rate ops/s if given"""
+        # Test with 2, 4, and 6 peers; each run gets its own ports, mounts and configs so
+        # up to `concurrency` of them can overlap when the host has cores to spare
+        peer_counts = list(range(2, 7, 2))
+        firsts = [sum(peer_counts[:i]) for i in range(len(peer_counts))]
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        # Sample resource usage in the background; the operation loops run in threads so
+        # the event loop is free to service the sampler
+        self.resource_samples = []
+        sampler = asyncio.create_task(self.sample_resources())
+        
+        # Create CSV file for logging; opened once and shared by every run
+        csv_file = "networked_volume_test.csv"
+        try:
+            with open(csv_file, 'wb', buffering=1 << 20) as csv_fh:
+                csv_fh.write(_FMT('timestamp', 'operation_type', 'file_name', 'data_written', 'files_created', 'peer_count').encode())
+                
+                async def run(peer_count: int, first: int):
+                    async with semaphore:
+                        await self.run_peer_count(csv_fh, peer_count, duration_seconds, first, burst_size, target_rate)
                 
-                # Clean up config files
-                for i in range(peer_count):
-                    os.remove(f"config{i}.json")
-                    # Clean up mount points
-                    subprocess.run(['fusermount', '-u', base_mounts[i]], check=False)
-                    await asyncio.sleep(1)  # Ensure unmount completes
+                # TaskGroup so one failing run cancels the rest before csv_fh is closed
+                async with asyncio.TaskGroup() as tg:
+                    for pc, first in zip(peer_counts, firsts):
+                        tg.create_task(run(pc, first))
+        finally:
+            sampler.cancel()
+        
+        if self.resource_samples:
+            cpu, memory = zip(*self.resource_samples)
+            self.results['networked_volumes_resource_usage'] = {
+                'cpu_percent_mean': statistics.mean(cpu),
+                'memory_mb_peak': max(memory)
+            }
         
         # Generate graphs
         self.generate_networked_volume_graphs(csv_file)
@@ -245,21 +427,42 @@ class FilesystemEvaluator:
 
     def generate_networked_volume_graphs(self, csv_file: str):
         """Generate graphs from the networked volume test data"""
+        import numpy as np
         import pandas as pd
+        import matplotlib
+        matplotlib.use('Agg') # Headless backend; skips GUI toolkit setup
         import matplotlib.pyplot as plt
+        plt.rcParams['agg.path.chunksize'] = 10000
         
         # Read the CSV data
-        df = pd.read_csv(csv_file)
+        # Read only the plotted columns, with compact dtypes
+        df = pd.read_csv(csv_file, usecols=lambda c: c != 'file_name',
+                         dtype={'operation_type': 'category', 'peer_count': 'int8'})
+        if 'cumulative_data' not in df:
+            # Per-burst log; rebuild the running totals (older CSVs carry them already)
+            groups = df.groupby(['operation_type', 'peer_count'], observed=True)
+            df['cumulative_files'] = groups['files_created'].cumsum()
+            df['cumulative_data'] = groups['data_written'].cumsum()
         
         # Create figure with 3 subplots
         fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 15))
         
-        # Plot 1: File Count over Time (for create operations)
-        create_data = df[df['operation_type'] == 'create']
-        for peer_count in range(2, 7, 2):
-            peer_data = create_data[create_data['peer_count'] == peer_count]
-            ax1.plot(peer_data['timestamp'], peer_data['cumulative_files'], 
+        # Group once by operation type and peer count instead of masking per plot
+        axes = {'create': ax1, 'create_with_data': ax2, 'append_data': ax3}
+        columns = {'create': 'cumulative_files', 'create_with_data': 'cumulative_data', 'append_data': 'cumulative_data'}
+        for (operation, peer_count), peer_data in df.groupby(['operation_type', 'peer_count'], observed=True):
+            if operation not in axes:
+                continue
+            x = peer_data['timestamp'].to_numpy()
+            y = peer_data[columns[operation]].to_numpy()
+            # Cumulative curves look the same decimated; keeps draw cost flat on long runs
+            if len(x) > MAX_PLOT_POINTS:
+                idx = np.linspace(0, len(x) - 1, MAX_PLOT_POINTS).astype(int)
+                x, y = x[idx], y[idx]
+            axes[operation].plot(x, y, 
                     label=f'{peer_count} peer{"s" if peer_count > 1 else ""}')
+        
+        # Plot 1: File Count over Time (for create operations)
         ax1.set_title('Cumulative File Count Over Time (Create Empty Files)')
         ax1.set_xlabel('Time (seconds)')
         ax1.set_ylabel('Number of Files')
@@ -267,11 +470,6 @@ class FilesystemEvaluator:
         ax1.grid(True)
         
         # Plot 2: Data Written over Time (for create_with_data operations)
-        create_with_data = df[df['operation_type'] == 'create_with_data']
-        for peer_count in range(2, 7, 2):
-            peer_data = create_with_data[create_with_data['peer_count'] == peer_count]
-            ax2.plot(peer_data['timestamp'], peer_data['cumulative_data'], 
-                    label=f'{peer_count} peer{"s" if peer_count > 1 else ""}')
         ax2.set_title('Cumulative Data Written (Create with 4B Data)')
         ax2.set_xlabel('Time (seconds)')
         ax2.set_ylabel('Data Written (bytes)')
@@ -279,11 +477,6 @@ class FilesystemEvaluator:
         ax2.grid(True)
         
         # Plot 3: Data Written over Time (for append operations)
-        append_data = df[df['operation_type'] == 'append_data']
-        for peer_count in range(2, 7, 2):
-            peer_data = append_data[append_data['peer_count'] == peer_count]
-            ax3.plot(peer_data['timestamp'], peer_data['cumulative_data'], 
-                    label=f'{peer_count} peer{"s" if peer_count > 1 else ""}')
         ax3.set_title('Cumulative Data Written (Append 4B Data)')
         ax3.set_xlabel('Time (seconds)')
         ax3.set_ylabel('Data Written (bytes)')
@@ -292,29 +485,54 @@ class FilesystemEvaluator:
         
         # Adjust layout and save
         plt.tight_layout()
-        plt.savefig('networked_volume_graphs.png')
+        plt.savefig('networked_volume_graphs.png', dpi=100)
         plt.close()
 
+    async def wait_for_sync(self, mount: str, ports: list[int], timeout: float = 300) -> float:
+        """Wait for peers to converge; returns seconds from the first test file reaching mount until every peer
+        has the first peer's filesystem tree and inode CRDTs at the same roots"""
+        import httpx
+        deadline = time.monotonic() + timeout
+
+        def arrived():
+            with os.scandir(mount) as entries:
+                return any(e.name.startswith("test_file_") and e.name.endswith(".dat") for e in entries)
+
+        # Wait for first file to appear on the peer to start timing; scandir goes through FUSE, so off the loop
+        while not await asyncio.to_thread(arrived):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"No test file reached {mount} within {timeout}s")
+            await asyncio.sleep(SYNC_POLL_SECONDS)
+        start_time = time.time()
+        
+        # The filesystem tree root alone matches as soon as the names arrive, before any contents do,
+        # so compare the writer's inode CRDT roots too. Polled coarsely since the peers answering
+        # are the ones being timed.
+        async with httpx.AsyncClient() as client:
+            while True:
+                responses = await asyncio.gather(*(client.get(f"http://localhost:{port}/roots") for port in ports))
+                writer, *others = (response.json() for response in responses)
+                if all(other.get(k) == r for other in others for k, r in writer.items()):
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Peers did not converge within {timeout}s")
+                await asyncio.sleep(SYNC_POLL_SECONDS)
+        
+        return time.time() - start_time
+
     async def test_sync_performance(self):
         """Test sync performance with different file sizes and counts"""
         import csv
         import subprocess
         import time
-        from datetime import datetime
-        import matplotlib.pyplot as plt
-        import pandas as pd
-        import numpy as np
 
         # Test configurations
         file_sizes = [1024, 10*1024, 100*1024]
         file_counts = [10, 100, 500]
         peer_count = 2  # Test with 2 peers for simplicity
 
-        # Create CSV file for logging
+        # CSV file for logging; opened once for the whole run below
         csv_file = "sync_performance_test.csv"
-        with open(csv_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['file_size', 'file_count', 'sync_time', 'total_data'])
 
         # Setup mount points and base paths
         base_mounts = [f"/tmp/mount{i}" for i in range(peer_count)]
@@ -322,74 +540,70 @@ class FilesystemEvaluator:
         base_ports = [8000 + i for i in range(peer_count)]
 
         # Clean up and create directories
-        for mount in base_mounts:
-            if os.path.exists(mount):
-                os.system(f"rm -rf {mount}")
-            os.makedirs(mount, exist_ok=True)
-
-        for base_path in base_paths:
-            if os.path.exists(base_path):
-                os.system(f"rm -rf {base_path}")
-            os.makedirs(base_path, exist_ok=True)
+        for path in base_mounts + base_paths:
+            shutil.rmtree(path, ignore_errors=True)
+            os.makedirs(path)
 
+        volumes = []
         try:
-            # Create config files and start volumes
-            volumes = []
+            # Write every config before starting any volume
             for i in range(peer_count):
-                config = {
+                write_config(f"config{i}.json", {
                     "replica": i + 1,
                     "peers": [f"localhost:{p}" for p in base_ports if p != base_ports[i]],
                     "basepath": base_paths[i],
                     "mountpoint": base_mounts[i],
                     "host": "localhost",
                     "port": base_ports[i]
-                }
-                
-                config_path = f"config{i}.json"
-                with open(config_path, 'w') as f:
-                    f.write(to_json(config))
-                
-                process = subprocess.Popen(['python', 'src/main.py', config_path])
-                volumes.append(process)
-                time.sleep(10)  # Wait for volume to mount
+                })
+            
+            volumes = [subprocess.Popen(['python', 'src/main.py', f"config{i}.json"]) for i in range(peer_count)]
+            await self.wait_for_mounts(base_mounts)
+
+            base0, base1 = base_mounts[0], base_mounts[1]
+
+            def create_file(i: int):
+                # Raw fd writes can be short, so loop until the whole payload is in
+                data = memoryview(payload)
+                fd = os.open(f"{base0}/test_file_{i}.dat", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                try:
+                    written = 0
+                    while written < len(data):
+                        written += os.write(fd, data[written:])
+                finally:
+                    os.close(fd)
+
+            def remove_file(i: int):
+                filename = f"test_file_{i}.dat"
+                os.remove(f"{base0}/{filename}")
+                if os.path.exists(f"{base1}/{filename}"):
+                    os.remove(f"{base1}/{filename}")
 
             # Run tests for each file size and count combination
-            for file_size in file_sizes:
-                for file_count in file_counts:
-                    print(f"\nTesting with {file_count} files of size {file_size/1024:.1f}KB")
-                    
-                    # Create files on first peer
-                    for i in range(file_count):
-                        filename = f"test_file_{i}.dat"
-                        filepath = Path(base_mounts[0]) / filename
-                        with open(filepath, 'wb') as f:
-                            f.write(os.urandom(file_size))
-                    
-                    # Wait for first file to appear on second peer to start timing
-                    while len(list(Path(base_mounts[1]).glob("test_file_*.dat"))) == 0:
-                        time.sleep(0.001)
-                    start_time = time.time()
+            with open(csv_file, 'w', newline='', buffering=65536) as csv_fh:
+                writer = csv.writer(csv_fh)
+                writer.writerow(['file_size', 'file_count', 'sync_time', 'total_data'])
+                for file_size in file_sizes:
+                    # Random so gzip on the sync path can't shrink it, but generated once per size
+                    payload = os.urandom(file_size)
+                    for file_count in file_counts:
+                        print(f"\nTesting with {file_count} files of size {file_size/1024:.1f}KB")
                     
-                    # Wait for all files to appear on second peer
-                    while len(list(Path(base_mounts[1]).glob("test_file_*.dat"))) < file_count:
-                        time.sleep(0.001)
+                        # Create files on first peer
+                        with ThreadPoolExecutor(max_workers=16) as ex:
+                            list(ex.map(create_file, range(file_count)))
                     
-                    sync_time = time.time() - start_time
-                    total_data = file_size * file_count
+                        sync_time = await self.wait_for_sync(base_mounts[1], base_ports)
+                        total_data = file_size * file_count
                     
-                    # Log results
-                    with open(csv_file, 'a', newline='') as f:
-                        writer = csv.writer(f)
+                        # Log results
                         writer.writerow([file_size, file_count, sync_time, total_data])
                     
-                    print(f"Sync completed in {sync_time:.2f} seconds")
+                        print(f"Sync completed in {sync_time:.2f} seconds")
                     
-                    # Clean up files
-                    for i in range(file_count):
-                        filename = f"test_file_{i}.dat"
-                        os.remove(Path(base_mounts[0]) / filename)
-                        if os.path.exists(Path(base_mounts[1]) / filename):
-                            os.remove(Path(base_mounts[1]) / filename)
+                        # Clean up files
+                        with ThreadPoolExecutor(max_workers=16) as ex:
+                            list(ex.map(remove_file, range(file_count)))
 
             # Generate plots
             self.generate_sync_performance_graphs(csv_file)
@@ -403,15 +617,18 @@ class FilesystemEvaluator:
             # Clean up config files and mount points
             for i in range(peer_count):
                 os.remove(f"config{i}.json")
-                subprocess.run(['fusermount', '-u', base_mounts[i]], check=False)
-                await asyncio.sleep(1)
+                subprocess.run(['fusermount', '-u', '-z', base_mounts[i]], check=False)
+                await self.wait_for_mount(base_mounts[i], timeout=5, mounted=False)
 
         return csv_file
 
     def generate_sync_performance_graphs(self, csv_file: str):
         """Generate graphs from the sync performance test data"""
         import pandas as pd
+        import matplotlib
+        matplotlib.use('Agg') # Headless backend; skips GUI toolkit setup
         import matplotlib.pyplot as plt
+        plt.rcParams['agg.path.chunksize'] = 10000
         import numpy as np
 
         # Read the CSV data
@@ -421,8 +638,7 @@ class FilesystemEvaluator:
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
         
         # Plot 1: Sync Time vs File Count for different file sizes
-        for file_size in df['file_size'].unique():
-            size_data = df[df['file_size'] == file_size]
+        for file_size, size_data in df.groupby('file_size', sort=False):
             ax1.plot(size_data['file_count'], size_data['sync_time'], 
                     marker='o', label=f'{file_size/1024:.1f}KB')
         
@@ -450,33 +666,28 @@ class FilesystemEvaluator:
         
         # Adjust layout and save
         plt.tight_layout()
-        plt.savefig('sync_performance_graphs.png')
+        plt.savefig('sync_performance_graphs.png', dpi=100)
         plt.close()
 
     async def run_evaluation(self):
         """Run all evaluations and collect results"""
         print("Starting filesystem evaluation...")
         
-        # Resource Usage
-        print("Measuring resource usage...")
-        cpu_usage, memory_usage = self.measure_resource_usage()
-        self.results['resource_usage'] = {
-            'cpu_percent': cpu_usage,
-            'memory_mb': memory_usage
-        }
-        
         # I/O Speed
         print("Measuring I/O speed...")
-        io_speed = await self.measure_io_speed()
+        io_speed, io_stdev, fsync_time = await self.measure_io_speed()
         self.results['io_speed'] = {
-            'mb_per_second': io_speed
+            'mb_per_second': io_speed,
+            'mb_per_second_stdev': io_stdev,
+            'fsync_seconds': fsync_time
         }
         
         # Filesystem Operations
         print("Measuring filesystem operations...")
-        fs_ops = await self.measure_fs_operations()
+        fs_ops, fs_latency = await self.measure_fs_operations()
         self.results['fs_operations'] = {
-            'ops_per_second': fs_ops
+            'ops_per_second': fs_ops,
+            **fs_latency
         }
         
         # Directory Operations
@@ -486,6 +697,14 @@ class FilesystemEvaluator:
             'ops_per_second': dir_ops
         }
         
+        # Resource Usage, sampled after the workload so CPU covers everything above
+        print("Measuring resource usage...")
+        cpu_usage, memory_usage = self.measure_resource_usage()
+        self.results['resource_usage'] = {
+            'cpu_percent': cpu_usage,
+            'memory_mb': memory_usage
+        }
+        
         return self.results
 
 async def main():
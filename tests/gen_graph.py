@@ -1,20 +1,44 @@
+# Longest curve drawn per peer count
+MAX_PLOT_POINTS = 4000
+
 def generate_networked_volume_graphs(csv_file: str):
     """Generate graphs from the networked volume test data"""
+    import numpy as np
     import pandas as pd
+    import matplotlib
+    matplotlib.use('Agg') # Headless backend; skips GUI toolkit setup
     import matplotlib.pyplot as plt
+    plt.rcParams['agg.path.chunksize'] = 10000
     
     # Read the CSV data
-    df = pd.read_csv(csv_file)
+    # Read only the plotted columns, with compact dtypes
+    df = pd.read_csv(csv_file, usecols=lambda c: c != 'file_name',
+                     dtype={'operation_type': 'category', 'peer_count': 'int8'})
+    if 'cumulative_data' not in df:
+        # Per-burst log; rebuild the running totals (older CSVs carry them already)
+        groups = df.groupby(['operation_type', 'peer_count'], observed=True)
+        df['cumulative_files'] = groups['files_created'].cumsum()
+        df['cumulative_data'] = groups['data_written'].cumsum()
     
     # Create figure with 3 subplots
     fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 15))
     
-    # Plot 1: File Count over Time (for create operations)
-    create_data = df[df['operation_type'] == 'create']
-    for peer_count in range(2, 7, 2):
-        peer_data = create_data[create_data['peer_count'] == peer_count]
-        ax1.plot(peer_data['timestamp'], peer_data['cumulative_files'], 
+    # Group once by operation type and peer count instead of masking per plot
+    axes = {'create': ax1, 'create_with_data': ax2, 'append_data': ax3}
+    columns = {'create': 'cumulative_files', 'create_with_data': 'cumulative_data', 'append_data': 'cumulative_data'}
+    for (operation, peer_count), peer_data in df.groupby(['operation_type', 'peer_count'], observed=True):
+        if operation not in axes:
+            continue
+        x = peer_data['timestamp'].to_numpy()
+        y = peer_data[columns[operation]].to_numpy()
+        # Cumulative curves look the same decimated; keeps draw cost flat on long runs
+        if len(x) > MAX_PLOT_POINTS:
+            idx = np.linspace(0, len(x) - 1, MAX_PLOT_POINTS).astype(int)
+            x, y = x[idx], y[idx]
+        axes[operation].plot(x, y, 
                 label=f'{peer_count} peer{"s" if peer_count > 1 else ""}')
+    
+    # Plot 1: File Count over Time (for create operations)
     ax1.set_title('Cumulative File Count Over Time (Create Empty Files)')
     ax1.set_xlabel('Time (Seconds)')
     ax1.set_ylabel('Number of Files')
@@ -22,11 +46,6 @@ def generate_networked_volume_graphs(csv_file: str):
     ax1.grid(True)
     
     # Plot 2: Data Written over Time (for create_with_data operations)
-    create_with_data = df[df['operation_type'] == 'create_with_data']
-    for peer_count in range(2, 7, 2):
-        peer_data = create_with_data[create_with_data['peer_count'] == peer_count]
-        ax2.plot(peer_data['timestamp'], peer_data['cumulative_data'], 
-                label=f'{peer_count} peer{"s" if peer_count > 1 else ""}')
     ax2.set_title('Cumulative Data Written (Create with 4B Data)')
     ax2.set_xlabel('Time (Seconds)')
     ax2.set_ylabel('Data Written (bytes)')
@@ -34,11 +53,6 @@ def generate_networked_volume_graphs(csv_file: str):
     ax2.grid(True)
     
     # Plot 3: Data Written over Time (for append operations)
-    append_data = df[df['operation_type'] == 'append_data']
-    for peer_count in range(2, 7, 2):
-        peer_data = append_data[append_data['peer_count'] == peer_count]
-        ax3.plot(peer_data['timestamp'], peer_data['cumulative_data'], 
-                label=f'{peer_count} peer{"s" if peer_count > 1 else ""}')
     ax3.set_title('Cumulative Data Written (Append 4B Data)')
     ax3.set_xlabel('Time (Seconds)')
     ax3.set_ylabel('Data Written (bytes)')
@@ -47,7 +61,7 @@ def generate_networked_volume_graphs(csv_file: str):
     
     # Adjust layout and save
     plt.tight_layout()
-    plt.savefig('networked_volume_graphs.png')
+    plt.savefig('networked_volume_graphs.png', dpi=100)
     plt.close()
     
     